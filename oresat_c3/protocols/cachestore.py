@@ -68,11 +68,19 @@ class CacheStore(VirtualFilestore, OreSatFileCache):
         with self._lock:
             for f in self._data:
                 if file.name == f.name:
-                    with open(self._dir + f.name, "r+b") as wf:
-                        if offset is not None:
-                            wf.seek(offset)
-                        wf.write(data)
-                        return
+                    # CFDP gives an explicit offset for every segment, so write it directly at that
+                    # position instead of going through a buffered file object and a seek
+                    fd = os.open(self._dir + f.name, os.O_WRONLY)
+                    try:
+                        view = memoryview(data)
+                        offset = offset or 0
+                        while view:
+                            written = os.pwrite(fd, view, offset)
+                            view = view[written:]
+                            offset += written
+                    finally:
+                        os.close(fd)
+                    return
             raise FileNotFoundError(file)
 
     def create_file(self, file: Path) -> FilestoreResult:
@@ -58,6 +58,8 @@ class VfsCrcHelper(CrcHelper):
     filestore, which failed when using the above PrefixFilestore.
     """
 
+    _MODULAR_READ_LEN = 4096  # must be a multiple of 4
+
     def calc_modular_checksum(self, file_path: Path) -> bytes:
         """Calculates the modular checksum of the file in file_path.
 
@@ -68,11 +70,14 @@ class VfsCrcHelper(CrcHelper):
         checksum = 0
         offset = 0
         while True:
-            data = self.vfs.read_data(file_path, offset, 4)
-            offset += 4
+            # read in large chunks, only the last chunk can be short (and needs padding)
+            data = self.vfs.read_data(file_path, offset, self._MODULAR_READ_LEN)
             if not data:
                 break
-            checksum += int.from_bytes(data.ljust(4, b"\0"), byteorder="big", signed=False)
+            offset += len(data)
+            if len(data) % 4:
+                data = data.ljust(len(data) + 4 - len(data) % 4, b"\0")
+            checksum += sum(struct.unpack(f">{len(data) // 4}I", data))
 
         checksum %= 2**32
         return struct.pack("!I", checksum)
@@ -298,29 +298,29 @@ class EdlCommandCode(IntEnum):
     """
 
 
+_SDO_WRITE_REQ_HEADER = struct.Struct("<BHBI")
+_SDO_READ_RES_HEADER = struct.Struct("<2I")
+
+
 def _edl_req_sdo_write_pack_cb(values: tuple) -> bytes:
-    req = struct.pack("<BHBI", *values[:4])
+    req = _SDO_WRITE_REQ_HEADER.pack(*values[:4])
     return req + values[4]
 
 
 def _edl_req_sdo_write_unpack_cb(raw: bytes) -> tuple:
-    fmt = "<BHBI"
-    size = struct.calcsize(fmt)
-    values = struct.unpack(fmt, raw[:size])
-    return values + (raw[size:],)
+    values = _SDO_WRITE_REQ_HEADER.unpack_from(raw)
+    return values + (raw[_SDO_WRITE_REQ_HEADER.size :],)
 
 
 def _edl_res_sdo_read_pack_cb(values: tuple) -> bytes:
-    res = struct.pack("<2I", *values[:2])
+    res = _SDO_READ_RES_HEADER.pack(*values[:2])
     res += values[2]
     return res
 
 
 def _edl_res_sdo_read_unpack_cb(raw: bytes) -> tuple:
-    fmt = "<2I"
-    size = struct.calcsize(fmt)
-    res = struct.unpack(fmt, raw[:size])
-    res += (raw[size:],)
+    res = _SDO_READ_RES_HEADER.unpack_from(raw)
+    res += (raw[_SDO_READ_RES_HEADER.size :],)
     return res
 
 
@@ -357,6 +357,18 @@ EDL_COMMANDS = {
 }
 """All valid EDL commands lookup table"""
 
+# the formats are fixed, so only compile them once
+_REQ_STRUCTS = {
+    code: struct.Struct(command.req_fmt)
+    for code, command in EDL_COMMANDS.items()
+    if command.req_fmt is not None
+}
+_RES_STRUCTS = {
+    code: struct.Struct(command.res_fmt)
+    for code, command in EDL_COMMANDS.items()
+    if command.res_fmt is not None
+}
+
 
 class EdlCommandError(Exception):
     """Error with EdlBase"""
@@ -367,6 +379,8 @@ class EdlCommandRequest:
     An request payload for an EDL command for the C3 to process.
     """
 
+    __slots__ = ("code", "command", "args")
+
     def __init__(self, code: EdlCommandCode, args: tuple):
         """
         Parameters
@@ -377,7 +391,7 @@ class EdlCommandRequest:
             The arguments for the EDL command
         """
 
-        if code not in list(EdlCommandCode):
+        if code not in EDL_COMMANDS:
             raise EdlCommandError(f"Invalid EDL code {code}")
         if not isinstance(args, tuple) and args is not None:
             raise EdlCommandError("EdlCommandRequest args must be a tuple or None")
@@ -402,7 +416,7 @@ class EdlCommandRequest:
         raw = self.code.value.to_bytes(1, "little")
 
         if self.command.req_fmt is not None:
-            raw += struct.pack(self.command.req_fmt, *self.args)
+            raw += _REQ_STRUCTS[self.code].pack(*self.args)
         elif self.command.req_pack_func is not None:
             raw += self.command.req_pack_func(self.args)
 
@@ -423,7 +437,7 @@ class EdlCommandRequest:
         command = EDL_COMMANDS[code]
 
         if command.req_fmt is not None:
-            args = struct.unpack(command.req_fmt, raw[1:])
+            args = _REQ_STRUCTS[code].unpack(raw[1:])
         elif command.req_unpack_func is not None:
             args = command.req_unpack_func(raw[1:])
         else:
@@ -437,6 +451,8 @@ class EdlCommandResponse:
     An response payload to an EDL command from the C3.
     """
 
+    __slots__ = ("code", "command", "values")
+
     def __init__(self, code: EdlCommandCode, values: tuple):
         """
         Parameters
@@ -447,7 +463,7 @@ class EdlCommandResponse:
             The return values for the response.
         """
 
-        if code not in list(EdlCommandCode):
+        if code not in EDL_COMMANDS:
             raise EdlCommandError(f"Invalid EDL code {code}")
         if not isinstance(values, tuple) and values is not None:
             raise EdlCommandError("EdlCommandResponse values must be a tuple or None")
@@ -469,7 +485,7 @@ class EdlCommandResponse:
         raw = self.code.value.to_bytes(1, "little")
 
         if self.command.res_fmt is not None:
-            raw += struct.pack(self.command.res_fmt, *self.values)
+            raw += _RES_STRUCTS[self.code].pack(*self.values)
         elif self.command.res_pack_func is not None:
             raw += self.command.res_pack_func(self.values)
 
@@ -490,7 +506,7 @@ class EdlCommandResponse:
         command = EDL_COMMANDS[code]
 
         if command.res_fmt is not None:
-            values = struct.unpack(command.res_fmt, raw[1:])
+            values = _RES_STRUCTS[code].unpack(raw[1:])
         elif command.res_unpack_func is not None:
             values = command.res_unpack_func(raw[1:])
         else:
@@ -6,6 +6,7 @@ import binascii
 import hashlib
 import hmac
 from enum import IntEnum
+from functools import lru_cache
 from typing import Union
 
 from spacepackets.cfdp.pdu import PduFactory
@@ -49,10 +50,19 @@ def crc16_bytes(data: bytes) -> bytes:
     return binascii.crc_hqx(data, 0).to_bytes(2, "little")
 
 
+@lru_cache(maxsize=4)
+def _hmac_template(hmac_key: bytes) -> hmac.HMAC:
+    """HMAC object with the key already loaded, copied for each message."""
+
+    return hmac.new(hmac_key, digestmod=hashlib.sha3_256)
+
+
 def gen_hmac(hmac_key: bytes, message: bytes) -> bytes:
     """Helper function to generate HMAC value from HMAC key and the message."""
 
-    return hmac.digest(hmac_key, message, hashlib.sha3_256)
+    h = _hmac_template(hmac_key).copy()
+    h.update(message)
+    return h.digest()
 
 
 class EdlPacket:
@@ -62,6 +72,8 @@ class EdlPacket:
     Only packs and unpacks the packet (does not process/run it).
     """
 
+    __slots__ = ("vcid", "src_dest", "seq_num", "payload")
+
     SPACECRAFT_ID = 0x4F53  # aka "OS" in ASCII
 
     PRIMARY_HEADER_LEN = 7
@@ -71,6 +83,10 @@ class EdlPacket:
     FECF_LEN = 2
     TC_MIN_LEN = PRIMARY_HEADER_LEN + SEQ_NUM_LEN + DFH_LEN + HMAC_LEN + FECF_LEN
 
+    USLP_VERSION = 0b1100
+    HEADER_ID = (USLP_VERSION << 16) | SPACECRAFT_ID
+    """The first 20 bits of the primary header (version number and spacecraft id) are fixed"""
+
     FRAME_PROPS = VarFrameProperties(
         has_insert_zone=True,
         has_fecf=True,
@@ -163,6 +179,23 @@ class EdlPacket:
 
         return packet
 
+    @classmethod
+    def peek_seq_num(cls, raw: bytes) -> int:
+        """
+        Get the sequence number of a raw EDL packet without unpacking or validating it.
+
+        Parameters
+        ----------
+        raw: bytes
+            The raw data to peek at.
+        """
+
+        if len(raw) < cls.TC_MIN_LEN:
+            raise EdlPacketError(f"EDL packet too short: {len(raw)}")
+
+        start = cls.PRIMARY_HEADER_LEN
+        return int.from_bytes(raw[start : start + cls.SEQ_NUM_LEN], "little")
+
     @classmethod
     def unpack(cls, raw: bytes, hmac_key: bytes, ignore_hmac: bool = False):
         """
@@ -181,6 +214,11 @@ class EdlPacket:
         if len(raw) < cls.TC_MIN_LEN:
             raise EdlPacketError(f"EDL packet too short: {len(raw)}")
 
+        # cheap check to drop noise and other spacecraft's frames before the CRC and HMAC
+        header_id = int.from_bytes(raw[:3], "big") >> 4
+        if header_id != cls.HEADER_ID:
+            raise EdlPacketError(f"invalid USLP version / spacecraft id: 0x{header_id:05X}")
+
         crc16_raw = raw[-cls.FECF_LEN :]
         crc16_raw_calc = crc16_bytes(raw[: -cls.FECF_LEN])
         if crc16_raw_calc != crc16_raw:
@@ -192,11 +230,12 @@ class EdlPacket:
             raise EdlPacketError("USLP invalid packet or frame length") from e
 
         payload_raw = frame.tfdf.tfdz[: -cls.HMAC_LEN]
-        hmac_bytes = frame.tfdf.tfdz[-cls.HMAC_LEN :]
-        hmac_bytes_calc = gen_hmac(hmac_key, payload_raw)
 
-        if not ignore_hmac and hmac_bytes != hmac_bytes_calc:
-            raise EdlPacketError(f"invalid HMAC {hmac_bytes.hex()} vs {hmac_bytes_calc.hex()}")
+        if not ignore_hmac:
+            hmac_bytes = frame.tfdf.tfdz[-cls.HMAC_LEN :]
+            hmac_bytes_calc = gen_hmac(hmac_key, payload_raw)
+            if not hmac.compare_digest(hmac_bytes, hmac_bytes_calc):
+                raise EdlPacketError(f"invalid HMAC {hmac_bytes.hex()} vs {hmac_bytes_calc.hex()}")
 
         if frame.header.vcid == EdlVcid.C3_COMMAND:
             try:
@@ -74,11 +74,11 @@ class BeaconService(Service):
 
         logger.debug("beacon")
 
-        payload = bytes()
+        payload = bytearray()
         for obj in self._beacon_def:
             value = self.node._on_sdo_read(obj.index, obj.subindex, obj)  # pylint: disable=W0212
-            payload += obj.encode_raw(value)
-        payload += zlib.crc32(payload, 0).to_bytes(4, "little")
+            payload.extend(obj.encode_raw(value))
+        payload.extend(zlib.crc32(payload, 0).to_bytes(4, "little"))
 
         packet = ax25_pack(
             self._dest_callsign,
@@ -1,11 +1,11 @@
 """'EDL Service"""
 
-from collections.abc import Iterable
+from collections import deque
 from datetime import timedelta
 from pathlib import Path
-from queue import Empty, SimpleQueue
+from queue import Empty
 from time import time
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Sequence
 
 import canopen
 from cfdppy import CfdpState, PacketDestination, get_packet_destination
@@ -35,7 +35,16 @@ from cfdppy.user import (
 from olaf import MasterNode, NodeStop, Service, logger
 from spacepackets.cfdp import ChecksumType, ConditionCode, FaultHandlerCode, TransmissionMode
 from spacepackets.cfdp.defs import DeliveryCode, FileStatus
-from spacepackets.cfdp.pdu import AbstractFileDirectiveBase
+from spacepackets.cfdp.pdu import (
+    AbstractFileDirectiveBase,
+    EofPdu,
+    FileDataPdu,
+    FinishedPdu,
+    KeepAlivePdu,
+    MetadataPdu,
+    NakPdu,
+    PromptPdu,
+)
 from spacepackets.cfdp.tlv import (
     DirectoryListingResponse,
     DirectoryOperationMessageType,
@@ -62,10 +71,45 @@ from .beacon import BeaconService
 from .node_manager import NodeManagerService
 from .radios import RadiosService
 
+# PDUs that always go to the same handler. ACKs are not included as their destination depends on
+# the acked directive, those (and anything else) fall back to get_packet_destination()
+_PDU_DESTINATIONS = {
+    FileDataPdu: PacketDestination.DEST_HANDLER,
+    MetadataPdu: PacketDestination.DEST_HANDLER,
+    EofPdu: PacketDestination.DEST_HANDLER,
+    PromptPdu: PacketDestination.DEST_HANDLER,
+    FinishedPdu: PacketDestination.SOURCE_HANDLER,
+    NakPdu: PacketDestination.SOURCE_HANDLER,
+    KeepAlivePdu: PacketDestination.SOURCE_HANDLER,
+}
+
+# CFDP entity ids, the ground station is the source and the C3 is the destination
+SOURCE_ID = ByteFieldU8(0)
+DEST_ID = ByteFieldU8(1)
+
+_CHECK_TIMER_DELTA = timedelta(seconds=5.0)
+
+
+def _resolve_od_obj(
+    od: canopen.ObjectDictionary, index: int, subindex: int
+) -> canopen.objectdictionary.Variable:
+    """Get the OD variable at index and subindex, raising the SDO abort for a missing subindex"""
+
+    entry = od[index]
+    if isinstance(entry, canopen.objectdictionary.Variable):
+        if subindex != 0:
+            raise canopen.sdo.exceptions.SdoAbortedError(0x06090011)
+        return entry
+    return entry[subindex]
+
 
 class EdlService(Service):
     """'EDL Service"""
 
+    _MAX_PACKETS_PER_LOOP = 8
+    _IDLE_RECV_TIMEOUT_S = 1.0
+    _BUSY_RECV_TIMEOUT_S = 0.05  # file transfers need their timers serviced
+
     def __init__(
         self,
         node: MasterNode,
@@ -85,6 +129,12 @@ class EdlService(Service):
         edl_rec = node.od["edl"]
         tx_rec = node.od["tx_control"]
         self._flight_mode_obj = node.od["flight_mode"]
+        self._edl_rec = edl_rec
+        self._active_crypto_key_obj = edl_rec["active_crypto_key"]
+        self._hmac_key_index = -1
+        self._hmac_key_obj: canopen.objectdictionary.Variable = None
+        self._busy = False
+        self._last_edl_ts = 0
         self._seq_num = edl_rec["sequence_count"].value
         self._tx_enable_obj = tx_rec["enable"]
         self._last_tx_enable_obj = tx_rec["last_enable_timestamp"]
@@ -92,11 +142,42 @@ class EdlService(Service):
         self._edl_rejected_count_obj = edl_rec["rejected_count"]
         self._last_edl_obj = edl_rec["last_timestamp"]
 
+        cmd_handlers = {
+            EdlCommandCode.TX_CTRL: self._cmd_tx_ctrl,
+            EdlCommandCode.C3_SOFT_RESET: self._cmd_c3_soft_reset,
+            EdlCommandCode.C3_HARD_RESET: self._cmd_c3_hard_reset,
+            EdlCommandCode.C3_FACTORY_RESET: self._cmd_c3_factory_reset,
+            EdlCommandCode.CO_NODE_ENABLE: self._cmd_co_node_enable,
+            EdlCommandCode.CO_NODE_STATUS: self._cmd_co_node_status,
+            EdlCommandCode.CO_SDO_WRITE: self._cmd_co_sdo_write,
+            EdlCommandCode.CO_SYNC: self._cmd_co_sync,
+            EdlCommandCode.OPD_SYSENABLE: self._cmd_opd_sysenable,
+            EdlCommandCode.OPD_SCAN: self._cmd_opd_scan,
+            EdlCommandCode.OPD_PROBE: self._cmd_opd_probe,
+            EdlCommandCode.OPD_ENABLE: self._cmd_opd_enable,
+            EdlCommandCode.OPD_RESET: self._cmd_opd_reset,
+            EdlCommandCode.OPD_STATUS: self._cmd_opd_status,
+            EdlCommandCode.RTC_SET_TIME: self._cmd_rtc_set_time,
+            EdlCommandCode.TIME_SYNC: self._cmd_time_sync,
+            EdlCommandCode.BEACON_PING: self._cmd_beacon_ping,
+            EdlCommandCode.PING: self._cmd_ping,
+            EdlCommandCode.RX_TEST: self._cmd_rx_test,
+            EdlCommandCode.CO_SDO_READ: self._cmd_co_sdo_read,
+        }
+        # command codes are small dense ints, so index by code value instead of hashing the enum
+        self._cmd_handlers: tuple[Optional[Callable[[tuple], Any]], ...] = tuple(
+            cmd_handlers.get(code) for code in range(max(EdlCommandCode) + 1)
+        )
+
     @property
     def _hmac_key(self) -> bytes:
-        edl_rec = self.node.od["edl"]
-        active_key = edl_rec["active_crypto_key"].value
-        return edl_rec[f"crypto_key_{active_key}"].value
+        # only look up the key object again when the active key changes, the key value itself
+        # is still read every time as it can be changed over SDO
+        active_key = self._active_crypto_key_obj.value
+        if active_key != self._hmac_key_index:
+            self._hmac_key_obj = self._edl_rec[f"crypto_key_{active_key}"]
+            self._hmac_key_index = active_key
+        return self._hmac_key_obj.value
 
     @property
     def _flight_mode(self) -> bool:
@@ -118,229 +199,299 @@ class EdlService(Service):
     def _rejected_count(self, value):
         self._edl_rejected_count_obj.value = value
 
-    def _upack_last_recv(self) -> Optional[EdlPacket]:
+    def _upack_last_recv(
+        self, message: bytes, hmac_key: bytes, flight_mode: bool
+    ) -> Optional[EdlPacket]:
         try:
-            message = self._radios_service.recv_queue.get_nowait()
-        except Empty:
-            return None
+            # check the sequence number before paying for the HMAC, so replays are cheap to drop
+            if flight_mode:
+                seq_num = EdlPacket.peek_seq_num(message)
+                if seq_num < self._sequence_count:
+                    self._rejected_count = (self._rejected_count + 1) & 0xFF_FF_FF_FF
+                    logger.error(
+                        f"invalid EDL request packet sequence number of {seq_num}, should be > "
+                        f"{self._sequence_count}"
+                    )
+                    return None  # no responses to invalid packets
 
-        try:
-            packet = EdlPacket.unpack(message, self._hmac_key, not self._flight_mode)
+            packet = EdlPacket.unpack(message, hmac_key, not flight_mode)
         except EdlPacketError as e:
-            self._rejected_count += 1
-            self._rejected_count &= 0xFF_FF_FF_FF
+            self._rejected_count = (self._rejected_count + 1) & 0xFF_FF_FF_FF
             logger.error(f"invalid EDL request packet: {e}")
             return None  # no responses to invalid packets
 
-        if self._flight_mode and packet.seq_num < self._sequence_count:
-            logger.error(
-                f"invalid EDL request packet sequence number of {packet.seq_num}, should be > "
-                f"{self._sequence_count}"
-            )
-            return None  # no responses to invalid packets
-
-        self._last_edl_obj.value = int(time())
-
-        if self._flight_mode:
-            self._sequence_count = packet.seq_num
-            self._sequence_count &= 0xFF_FF_FF_FF
+        if flight_mode:
+            self._sequence_count = packet.seq_num & 0xFF_FF_FF_FF
 
         return packet
 
     def on_loop(self):
-        req_packet = self._upack_last_recv()
+        recv_queue = self._radios_service.recv_queue
+        file_receiver_idle = self._file_receiver.state == CfdpState.IDLE
+
+        # block on the queue instead of polling it with a sleep, don't wait at all if there was
+        # work last loop
+        if self._busy:
+            timeout = 0.0
+        elif file_receiver_idle:
+            timeout = self._IDLE_RECV_TIMEOUT_S
+        else:
+            timeout = self._BUSY_RECV_TIMEOUT_S
+        try:
+            message = recv_queue.get(timeout=timeout)
+        except Empty:
+            message = None
 
-        if req_packet is None:
-            if self._file_receiver.state == CfdpState.BUSY:
-                res_payload = self._file_receiver.loop(None)
-            else:
-                self.sleep_ms(50)
-                return
-        elif req_packet.vcid == EdlVcid.C3_COMMAND:
+        # nothing received and no file transfer in progress, skip the OD reads
+        if message is None and file_receiver_idle:
+            self._busy = False
+            return
+
+        hmac_key = self._hmac_key
+        flight_mode = self._flight_mode
+
+        # drain a bounded number of queued packets per loop, so a backlog from the radios does
+        # not get throttled to one packet per loop
+        busy = False
+        responses = []
+        for _ in range(self._MAX_PACKETS_PER_LOOP):
+            if message is None:
+                try:
+                    message = recv_queue.get_nowait()
+                except Empty:
+                    break
+            req_packet = self._upack_last_recv(message, hmac_key, flight_mode)
+            message = None
+            if req_packet is None:
+                continue
+            if not busy:
+                # first accepted packet this loop, update before processing it so commands and
+                # beacons see the current contact time
+                now = int(time())
+                if now != self._last_edl_ts:  # only has 1 second resolution
+                    self._last_edl_obj.value = now
+                    self._last_edl_ts = now
+            res_payloads = self._process_packet(req_packet)
+            if res_payloads is not None:
+                # responses carry the sequence number as of the request they answer
+                responses.append((self._sequence_count, res_payloads))
+            busy = True
+            if req_packet.vcid == EdlVcid.C3_COMMAND:
+                # a command can change the active key, a key or the flight mode (CO_SDO_WRITE)
+                hmac_key = self._hmac_key
+                flight_mode = self._flight_mode
+
+        if not busy and self._file_receiver.state == CfdpState.BUSY:
+            res_payloads = self._file_receiver.loop(None)
+            if res_payloads is not None:
+                responses.append((self._sequence_count, res_payloads))
+                busy = True
+
+        # pack and send everything generated this loop in one pass
+        self._send_responses(responses)
+
+        self._busy = busy
+
+    def _process_packet(self, req_packet: EdlPacket) -> Optional[Sequence[Any]]:
+        """Process a request packet, returns the response payloads (if any)"""
+
+        if req_packet.vcid == EdlVcid.C3_COMMAND:
             try:
                 res_payload = self._run_cmd(req_packet.payload)
                 if not res_payload.values:
-                    return  # no response
+                    return None  # no response
             except Exception as e:  # pylint: disable=W0718
                 logger.error(f"EDL command {req_packet.payload.code.name} raised: {e}")
-                return
-        elif req_packet.vcid == EdlVcid.FILE_TRANSFER:
-            res_payload = self._file_receiver.loop(req_packet.payload)
-        else:
-            logger.error(f"got an EDL packet with unknown VCID: {req_packet.vcid}")
-            return
+                return None
+            return (res_payload,)
 
-        if res_payload is None:
-            self.sleep_ms(50)
+        if req_packet.vcid == EdlVcid.FILE_TRANSFER:
+            return self._file_receiver.loop(req_packet.payload)
+
+        logger.error(f"got an EDL packet with unknown VCID: {req_packet.vcid}")
+        return None
+
+    def _send_responses(self, responses: list):
+        """Pack and send (sequence number, response payloads) pairs."""
+
+        if not responses:
             return
 
-        if not isinstance(res_payload, Iterable):
-            res_payload = (res_payload,)
-        for payload in res_payload:
-            try:
-                res_packet = EdlPacket(payload, self._sequence_count, SRC_DEST_UNICLOGS)
-                res_message = res_packet.pack(self._hmac_key)
-            except (EdlCommandError, EdlPacketError, ValueError) as e:
-                logger.exception(f"EDL response generation raised: {e}")
-                continue
+        hmac_key = self._hmac_key  # the key in effect now, commands in the drain may change it
+        for seq_num, payloads in responses:
+            for payload in payloads:
+                try:
+                    res_packet = EdlPacket(payload, seq_num, SRC_DEST_UNICLOGS)
+                    res_message = res_packet.pack(hmac_key)
+                except (EdlCommandError, EdlPacketError, ValueError) as e:
+                    logger.exception(f"EDL response generation raised: {e}")
+                    continue
 
-            self._radios_service.send_edl_response(res_message)
+                self._radios_service.send_edl_response(res_message)
 
     def _run_cmd(self, request: EdlCommandRequest) -> EdlCommandResponse:
-        ret: Any = None
+        code_name = request.code.name
+        logger.info(f"EDL command request: {code_name}, args: {request.args}")
 
-        logger.info(f"EDL command request: {request.code.name}, args: {request.args}")
-
-        if request.code == EdlCommandCode.TX_CTRL:
-            if request.args[0] == 0:
-                logger.info("EDL disabling Tx")
-                self._tx_enable_obj.value = False
-                self._last_tx_enable_obj.value = 0
-                ret = False
-            else:
-                logger.info("EDL enabling Tx")
-                self._tx_enable_obj.value = True
-                self._last_tx_enable_obj.value = int(time())
-                ret = True
-        elif request.code == EdlCommandCode.C3_SOFT_RESET:
-            logger.info("EDL soft reset")
-            self.node.stop(NodeStop.SOFT_RESET)
-        elif request.code == EdlCommandCode.C3_HARD_RESET:
-            logger.info("EDL hard reset")
-            self.node.stop(NodeStop.HARD_RESET)
-        elif request.code == EdlCommandCode.C3_FACTORY_RESET:
-            logger.info("EDL factory reset")
-            self.node.stop(NodeStop.FACTORY_RESET)
-        elif request.code == EdlCommandCode.CO_NODE_ENABLE:
-            node_id = request.args[0]
-            name = self._node_mgr_service.node_id_to_name[node_id]
-            logger.info(f"EDL enabling CANopen node {name} (0x{node_id:02X})")
-        elif request.code == EdlCommandCode.CO_NODE_STATUS:
-            node_id = request.args[0]
-            name = self._node_mgr_service.node_id_to_name[node_id]
-            logger.info(f"EDL getting CANopen node {name} (0x{node_id:02X}) status")
-            ret = self.node.node_status[name]
-        elif request.code == EdlCommandCode.CO_SDO_WRITE:
-            node_id, index, subindex, _, data = request.args
-            name = self._node_mgr_service.node_id_to_name[node_id]
-            logger.info(f"EDL SDO read on CANopen node {name} (0x{node_id:02X})")
-            try:
-                if node_id == 1:
-                    var_index = isinstance(self.node.od[index], canopen.objectdictionary.Variable)
-                    if var_index and subindex == 0:
-                        obj = self.node.od[index]
-                    elif not var_index:
-                        obj = self.node.od[index][subindex]
-                    else:
-                        raise canopen.sdo.exceptions.SdoAbortedError(0x06090011)
-                    self.node._on_sdo_write(index, subindex, obj, data)  # pylint: disable=W0212
-                else:
-                    self.node.sdo_write(name, index, subindex, data)
-                ret = 0
-            except canopen.sdo.exceptions.SdoAbortedError as e:
-                logger.error(e)
-                ret = e.code
-        elif request.code == EdlCommandCode.CO_SYNC:
-            logger.info("EDL sending CANopen SYNC message")
-            self.node.send_sync()
-        elif request.code == EdlCommandCode.OPD_SYSENABLE:
-            enable = request.args[0]
-            if enable:
-                logger.info("EDL enabling OPD subsystem")
-                self._node_mgr_service.opd.enable()
-            else:
-                logger.info("EDL disabling OPD subsystem")
-                self._node_mgr_service.opd.disable()
-            ret = self._node_mgr_service.opd.status.value
-        elif request.code == EdlCommandCode.OPD_SCAN:
-            logger.info("EDL scaning for all OPD nodes")
-            ret = self._node_mgr_service.opd.scan()
-        elif request.code == EdlCommandCode.OPD_PROBE:
-            opd_addr = request.args[0]
-            name = self._node_mgr_service.opd_addr_to_name[opd_addr]
-            logger.info(f"EDL probing for OPD node {name} (0x{opd_addr:02X})")
-            ret = self._node_mgr_service.opd[name].probe()
-        elif request.code == EdlCommandCode.OPD_ENABLE:
-            opd_addr = request.args[0]
-            name = self._node_mgr_service.opd_addr_to_name[opd_addr]
-            node = self._node_mgr_service.opd[name]
-            if request.args[1] == 0:
-                logger.info(f"EDL disabling OPD node {name} (0x{opd_addr:02X})")
-                ret = node.disable()
-            else:
-                logger.info(f"EDL enabling OPD node {name} (0x{opd_addr:02X})")
-                ret = node.enable()
-            ret = node.status.value
-        elif request.code == EdlCommandCode.OPD_RESET:
-            opd_addr = request.args[0]
-            name = self._node_mgr_service.opd_addr_to_name[opd_addr]
-            logger.info(f"EDL resetting OPD node {name} (0x{opd_addr:02X})")
-            node = self._node_mgr_service.opd[name]
-            node.reset()
-            ret = node.status.value
-        elif request.code == EdlCommandCode.OPD_STATUS:
-            opd_addr = request.args[0]
-            name = self._node_mgr_service.opd_addr_to_name[opd_addr]
-            logger.info(f"EDL getting the status for OPD node {name} (0x{opd_addr:02X})")
-            ret = self._node_mgr_service.opd[name].status.value
-        elif request.code == EdlCommandCode.RTC_SET_TIME:
-            ts = request.args[0]
-            logger.info(f"EDL setting the RTC time to {ts}")
-            set_rtc_time(ts)
-            set_system_time_to_rtc_time()
-        elif request.code == EdlCommandCode.TIME_SYNC:
-            logger.info("EDL sending time sync TPDO")
-            self.node.send_tpdo(0)
-        elif request.code == EdlCommandCode.BEACON_PING:
-            logger.info("EDL beacon")
-            self._beacon_service.send()
-        elif request.code == EdlCommandCode.PING:
-            logger.info("EDL ping")
-            ret = request.args[0]
-        elif request.code == EdlCommandCode.RX_TEST:
-            logger.info("EDL Rx test")
-        elif request.code == EdlCommandCode.CO_SDO_READ:
-            node_id, index, subindex = request.args
-            name = self._node_mgr_service.node_id_to_name[node_id]
-            logger.info(f"EDL SDO read on CANopen node {name} (0x{node_id:02X})")
-            data = b""
-            ecode = 0
-            try:
-                if node_id == 1:
-                    var_index = isinstance(self.node.od[index], canopen.objectdictionary.Variable)
-                    if var_index and subindex == 0:
-                        obj = self.node.od[index]
-                    elif not var_index:
-                        obj = self.node.od[index][subindex]
-                    else:
-                        raise canopen.sdo.exceptions.SdoAbortedError(0x06090011)
-                    value = self.node._on_sdo_read(index, subindex, obj)  # pylint: disable=W0212
-                    data = obj.encode_raw(value)
-                else:
-                    value = self.node.sdo_read(name, index, subindex)
-                    od = self.node.od_db[name]
-                    var_index = isinstance(od[index], canopen.objectdictionary.Variable)
-                    if var_index and subindex == 0:
-                        obj = od[index]
-                    elif not var_index:
-                        obj = od[index][subindex]
-                    else:
-                        raise canopen.sdo.exceptions.SdoAbortedError(0x06090011)
-                    data = obj.encode_raw(value)
-            except canopen.sdo.exceptions.SdoAbortedError as e:
-                logger.error(e)
-                ecode = e.code
-            ret = (ecode, len(data), data)
+        handler = self._cmd_handlers[request.code]
+        if handler is None:
+            raise ValueError(f"no handler for EDL command {code_name}")
+        ret = handler(request.args)
 
         if ret is not None and not isinstance(ret, tuple):
             ret = (ret,)  # make ret a tuple
 
         response = EdlCommandResponse(request.code, ret)
 
-        logger.info(f"EDL command response: {response.code.name}, values: {response.values}")
+        logger.info(f"EDL command response: {code_name}, values: {response.values}")
 
         return response
 
+    def _cmd_tx_ctrl(self, args: tuple) -> bool:
+        if args[0] == 0:
+            logger.info("EDL disabling Tx")
+            self._tx_enable_obj.value = False
+            self._last_tx_enable_obj.value = 0
+            return False
+
+        logger.info("EDL enabling Tx")
+        self._tx_enable_obj.value = True
+        self._last_tx_enable_obj.value = int(time())
+        return True
+
+    def _cmd_c3_soft_reset(self, _args: tuple):
+        logger.info("EDL soft reset")
+        self.node.stop(NodeStop.SOFT_RESET)
+
+    def _cmd_c3_hard_reset(self, _args: tuple):
+        logger.info("EDL hard reset")
+        self.node.stop(NodeStop.HARD_RESET)
+
+    def _cmd_c3_factory_reset(self, _args: tuple):
+        logger.info("EDL factory reset")
+        self.node.stop(NodeStop.FACTORY_RESET)
+
+    def _cmd_co_node_enable(self, args: tuple):
+        node_id = args[0]
+        name = self._node_mgr_service.node_id_to_name[node_id]
+        logger.info(f"EDL enabling CANopen node {name} (0x{node_id:02X})")
+
+    def _cmd_co_node_status(self, args: tuple) -> int:
+        node_id = args[0]
+        name = self._node_mgr_service.node_id_to_name[node_id]
+        logger.info(f"EDL getting CANopen node {name} (0x{node_id:02X}) status")
+        return self.node.node_status[name]
+
+    def _cmd_co_sdo_write(self, args: tuple) -> int:
+        node_id, index, subindex, _, data = args
+        name = self._node_mgr_service.node_id_to_name[node_id]
+        logger.info(f"EDL SDO read on CANopen node {name} (0x{node_id:02X})")
+        node = self.node
+        try:
+            if node_id == 1:
+                obj = _resolve_od_obj(node.od, index, subindex)
+                node._on_sdo_write(index, subindex, obj, data)  # pylint: disable=W0212
+            else:
+                node.sdo_write(name, index, subindex, data)
+            ret = 0
+        except canopen.sdo.exceptions.SdoAbortedError as e:
+            logger.error(e)
+            ret = e.code
+        return ret
+
+    def _cmd_co_sync(self, _args: tuple):
+        logger.info("EDL sending CANopen SYNC message")
+        self.node.send_sync()
+
+    def _cmd_opd_sysenable(self, args: tuple) -> int:
+        enable = args[0]
+        opd = self._node_mgr_service.opd
+        if enable:
+            logger.info("EDL enabling OPD subsystem")
+            opd.enable()
+        else:
+            logger.info("EDL disabling OPD subsystem")
+            opd.disable()
+        return opd.status.value
+
+    def _cmd_opd_scan(self, _args: tuple) -> int:
+        logger.info("EDL scaning for all OPD nodes")
+        return self._node_mgr_service.opd.scan()
+
+    def _cmd_opd_probe(self, args: tuple) -> bool:
+        opd_addr = args[0]
+        node_mgr = self._node_mgr_service
+        name = node_mgr.opd_addr_to_name[opd_addr]
+        logger.info(f"EDL probing for OPD node {name} (0x{opd_addr:02X})")
+        return node_mgr.opd[name].probe()
+
+    def _cmd_opd_enable(self, args: tuple) -> int:
+        opd_addr = args[0]
+        name = self._node_mgr_service.opd_addr_to_name[opd_addr]
+        node = self._node_mgr_service.opd[name]
+        if args[1] == 0:
+            logger.info(f"EDL disabling OPD node {name} (0x{opd_addr:02X})")
+            node.disable()
+        else:
+            logger.info(f"EDL enabling OPD node {name} (0x{opd_addr:02X})")
+            node.enable()
+        return node.status.value
+
+    def _cmd_opd_reset(self, args: tuple) -> int:
+        opd_addr = args[0]
+        name = self._node_mgr_service.opd_addr_to_name[opd_addr]
+        logger.info(f"EDL resetting OPD node {name} (0x{opd_addr:02X})")
+        node = self._node_mgr_service.opd[name]
+        node.reset()
+        return node.status.value
+
+    def _cmd_opd_status(self, args: tuple) -> int:
+        opd_addr = args[0]
+        name = self._node_mgr_service.opd_addr_to_name[opd_addr]
+        logger.info(f"EDL getting the status for OPD node {name} (0x{opd_addr:02X})")
+        return self._node_mgr_service.opd[name].status.value
+
+    def _cmd_rtc_set_time(self, args: tuple):
+        ts = args[0]
+        logger.info(f"EDL setting the RTC time to {ts}")
+        set_rtc_time(ts)
+        set_system_time_to_rtc_time()
+
+    def _cmd_time_sync(self, _args: tuple):
+        logger.info("EDL sending time sync TPDO")
+        self.node.send_tpdo(0)
+
+    def _cmd_beacon_ping(self, _args: tuple):
+        logger.info("EDL beacon")
+        self._beacon_service.send()
+
+    def _cmd_ping(self, args: tuple) -> int:
+        logger.info("EDL ping")
+        return args[0]
+
+    def _cmd_rx_test(self, _args: tuple):
+        logger.info("EDL Rx test")
+
+    def _cmd_co_sdo_read(self, args: tuple) -> tuple:
+        node_id, index, subindex = args
+        name = self._node_mgr_service.node_id_to_name[node_id]
+        logger.info(f"EDL SDO read on CANopen node {name} (0x{node_id:02X})")
+        data = b""
+        ecode = 0
+        node = self.node
+        try:
+            if node_id == 1:
+                obj = _resolve_od_obj(node.od, index, subindex)
+                value = node._on_sdo_read(index, subindex, obj)  # pylint: disable=W0212
+            else:
+                value = node.sdo_read(name, index, subindex)
+                obj = _resolve_od_obj(node.od_db[name], index, subindex)
+            data = obj.encode_raw(value)
+        except canopen.sdo.exceptions.SdoAbortedError as e:
+            logger.error(e)
+            ecode = e.code
+        return (ecode, len(data), data)
+
 
 class LogFaults(DefaultFaultHandlerBase):
     """A HaultHandler that only logs the faults and nothing more.
@@ -369,7 +520,7 @@ class DefaultCheckTimer(CheckTimerProvider):
     """
 
     def provide_check_timer(self, local_entity_id, remote_entity_id, entity_type) -> Countdown:
-        return Countdown(timedelta(seconds=5.0))
+        return Countdown(_CHECK_TIMER_DELTA)
 
 
 class EdlFileReciever(CfdpUserBase):
@@ -378,25 +529,17 @@ class EdlFileReciever(CfdpUserBase):
     def __init__(self, fwrite_cache: CacheStore):
         super().__init__(vfs=fwrite_cache)
 
-        self.proxy_responses = {  # FIXME: defaultdict with invalid response
-            ProxyMessageType.PUT_REQUEST: self.proxy_put_response,
-            ProxyMessageType.MSG_TO_USER: self.unimplemented,
-            ProxyMessageType.FS_REQUEST: self.unimplemented,
-            ProxyMessageType.FAULT_HANDLER_OVERRIDE: self.unimplemented,
-            ProxyMessageType.TRANSMISSION_MODE: self.unimplemented,
-            ProxyMessageType.FLOW_LABEL: self.unimplemented,
-            ProxyMessageType.SEGMENTATION_CTRL: self.unimplemented,
-            ProxyMessageType.PUT_RESPONSE: self.unimplemented,
-            ProxyMessageType.FS_RESPONSE: self.unimplemented,
-            ProxyMessageType.PUT_CANCEL: self.unimplemented,
-            ProxyMessageType.CLOSURE_REQUEST: self.unimplemented,
-            DirectoryOperationMessageType.LISTING_REQUEST: self.directory_listing_response,
-            DirectoryOperationMessageType.LISTING_RESPONSE: self.unimplemented,
-            DirectoryOperationMessageType.CUSTOM_LISTING_PARAMETERS: self.unimplemented,
+        # Proxy and directory operation message types share one value space without overlap, so
+        # the handlers are a tuple indexed by value with every unimplemented type filled in
+        implemented = {
+            ProxyMessageType.PUT_REQUEST.value: self.proxy_put_response,
+            DirectoryOperationMessageType.LISTING_REQUEST.value: self.directory_listing_response,
         }
+        max_type = max(max(ProxyMessageType).value, max(DirectoryOperationMessageType).value)
+        self.proxy_responses = tuple(
+            implemented.get(i, self.unimplemented) for i in range(max_type + 1)
+        )
 
-        SOURCE_ID = ByteFieldU8(0)
-        DEST_ID = ByteFieldU8(1)
         fault_handler = LogFaults()
         # The default setting is NOTICE_OF_CANCELLATION but during that process the positive ack
         # counter gets reset, meaning we keep retrying the handler forever. This manifests for
@@ -448,7 +591,8 @@ class EdlFileReciever(CfdpUserBase):
         )
         self.source._crc_helper = VfsCrcHelper(ChecksumType.NULL_CHECKSUM, self.vfs)
 
-        self.scheduled_requests: SimpleQueue[PutRequest] = SimpleQueue()
+        # only used from the EDL service thread (loop() and the indications it triggers)
+        self.scheduled_requests: deque[PutRequest] = deque()
         self.active_requests: dict[TransactionId, TransactionId] = {}
 
     @property
@@ -462,7 +606,7 @@ class EdlFileReciever(CfdpUserBase):
         if (
             self.dest.state == CfdpState.BUSY
             or self.source.state == CfdpState.BUSY
-            or not self.scheduled_requests.empty()
+            or self.scheduled_requests
         ):
             return CfdpState.BUSY
         return CfdpState.IDLE
@@ -475,12 +619,19 @@ class EdlFileReciever(CfdpUserBase):
         # Timers only expire when .state_machine() is called, and .state_machine() must
         # be called after all the packets have been drained, or after inserting a new
         # pdu.
+        dest_inserted = False
+        source_inserted = False
         if pdu:
-            logger.info(f"<--- {pdu}")
+            logger.debug("<--- {}", pdu)
+
+            destination = _PDU_DESTINATIONS.get(type(pdu))
+            if destination is None:
+                destination = get_packet_destination(pdu)
 
-            if get_packet_destination(pdu) == PacketDestination.DEST_HANDLER:
+            if destination == PacketDestination.DEST_HANDLER:
                 try:
                     self.dest.insert_packet(pdu)
+                    dest_inserted = True
                 except Exception:
                     # Usually this exception means the library is being used wrong, so we have
                     # to be careful here. However there is a bug in the presence of dropped packets
@@ -490,16 +641,14 @@ class EdlFileReciever(CfdpUserBase):
             else:
                 try:
                     self.source.insert_packet(pdu)
+                    source_inserted = True
                 except Exception:
                     logger.exception("source.state_machine() didn't properly clear inserted packet")
                     self.source.reset()
 
         if self.dest.state == CfdpState.IDLE and self.source.state == CfdpState.IDLE:
-            try:
-                request = self.scheduled_requests.get_nowait()
-            except Empty:
-                pass
-            else:
+            if self.scheduled_requests:
+                request = self.scheduled_requests.popleft()
                 try:
                     self.source.put_request(request)
                 except (SourceFileDoesNotExist, NoRemoteEntityCfgFound):
@@ -508,11 +657,14 @@ class EdlFileReciever(CfdpUserBase):
                     # standard set of errors that cover this condition, and the least worst option
                     # resulted in an identical message to missing_file. Not super great, so if
                     # there's a better idea of how to handle this, please change.
-                    self.scheduled_requests.put(self.missing_file_response(request))
+                    self.scheduled_requests.append(self.missing_file_response(request))
 
+        # an idle handler with nothing inserted has no timers running, so nothing to update
         try:
-            self.dest.state_machine()
-            self.source.state_machine()
+            if dest_inserted or self.dest.state == CfdpState.BUSY:
+                self.dest.state_machine()
+            if source_inserted or self.source.state == CfdpState.BUSY:
+                self.source.state_machine()
         except Exception:
             logger.exception("state_machine failed to update")
             self.dest.reset()
@@ -524,8 +676,8 @@ class EdlFileReciever(CfdpUserBase):
         while self.source.packets_ready:
             pdus.append(self.source.get_next_packet().pdu)
 
-        for out in pdus:
-            logger.info(f"---> {out}")
+        if pdus:
+            logger.opt(lazy=True).debug("---> {}", lambda: "\n---> ".join(str(out) for out in pdus))
         return pdus or None
 
     def unimplemented(self, _source, _tid, _reserved_message) -> PutRequest:
@@ -626,20 +778,29 @@ class EdlFileReciever(CfdpUserBase):
             originating_id = self.active_requests.get(params.transaction_id)
             assert originating_id is not None
             put = self.proxy_request_complete(originating_id, params)
-            self.scheduled_requests.put(put)
+            self.scheduled_requests.append(put)
             del self.active_requests[params.transaction_id]
 
     def metadata_recv_indication(self, params: MetadataRecvParams):
         logger.info(f"Indication: Metadata Recv. {params}")
         for msg in params.msgs_to_user or []:
             if r := msg.to_reserved_msg_tlv():  # is None if not a reserved TLV message
-                op = r.get_cfdp_proxy_message_type() or r.get_directory_operation_type()
-                put = self.proxy_responses[op](params.source_id, params.transaction_id, r)
-                self.scheduled_requests.put(put)
+                # not `or`, PUT_REQUEST has the value 0
+                op = r.get_cfdp_proxy_message_type()
+                if op is None:
+                    op = r.get_directory_operation_type()
+                if op is None:
+                    continue  # not a proxy or directory operation
+                if op.value < len(self.proxy_responses):
+                    handler = self.proxy_responses[op.value]
+                else:
+                    handler = self.unimplemented
+                put = handler(params.source_id, params.transaction_id, r)
+                self.scheduled_requests.append(put)
             # Ignore non-reserved messages for now
 
     def file_segment_recv_indication(self, params: FileSegmentRecvdParams):
-        logger.info(f"Indication: File Segment Recv. {params}")
+        logger.debug("Indication: File Segment Recv. {}", params)
 
     def report_indication(self, transaction_id: TransactionId, status_report: Any):
         logger.info(f"Indication: Report for {transaction_id}. {status_report}")
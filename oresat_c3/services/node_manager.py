@@ -3,10 +3,10 @@ Node manager service.
 """
 
 import json
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, fields
 from enum import IntEnum
 from time import monotonic
-from typing import Union
+from typing import Optional, Union
 
 import canopen
 from dataclasses_json import dataclass_json
@@ -65,6 +65,10 @@ class Node(Card):
     """Node status."""
 
 
+_CARD_FIELDS = tuple(f.name for f in fields(Card))
+"""Card fields to copy into a Node, a shallow copy instead of asdict()'s recursive one."""
+
+
 class NodeManagerService(Service):
     """Node manager service."""
 
@@ -73,6 +77,18 @@ class NodeManagerService(Service):
     _STM32_BOOT_TIMEOUT = 10
     _OCTAVO_BOOT_TIMEOUT = 90
     _HB_TIMEOUT = 5
+    _PROBE_LOOPS = 10
+
+    # prebuilt state groups for the membership tests in on_loop / disable
+    _OPD_INACTIVE_NODE_STATES = {
+        OpdState.DISABLED: NodeState.NOT_FOUND,
+        OpdState.DEAD: NodeState.DEAD,
+    }
+    """State of every node on the OPD while the OPD subsystem is disabled or dead."""
+    _NODE_STABLE_STATES = (NodeState.ON, NodeState.OFF)
+    _NODE_DISABLED_STATES = (NodeState.OFF, NodeState.DEAD)
+    _STATE_IDX = {state: i for i, state in enumerate(NodeState)}
+    """Compact index of each state in the per-loop state tally (DEAD is 0xFF)."""
 
     # opd hardware constants
     _NOT_ENABLE_PIN = "OPD_nENABLE"
@@ -108,9 +124,26 @@ class NodeManagerService(Service):
         self.opd_addr_to_name = {info.opd_address: name for name, info in cards.items()}
         self.node_id_to_name = {info.node_id: name for name, info in cards.items()}
 
-        self._data = {name: Node(**asdict(info)) for name, info in cards.items()}
+        self._data = {
+            name: Node(**{f: getattr(info, f) for f in _CARD_FIELDS})
+            for name, info in cards.items()
+        }
         self._data["c3"].status = NodeState.ON
+        # the node set is fixed, so prebuild what on_loop iterates over
+        self._monitored_nodes = tuple((n, d) for n, d in self._data.items() if n != "c3")
+        # each opd node is probed on its own loop out of every _PROBE_LOOPS to spread out i2c use
+        opd_nodes = [(n, d) for n, d in self._data.items() if d.opd_address != 0]
+        self._opd_nodes = tuple((n, d, i % self._PROBE_LOOPS) for i, (n, d) in enumerate(opd_nodes))
+        self._boot_timeouts = {
+            n: self._STM32_BOOT_TIMEOUT if d.processor == "stm32" else self._OCTAVO_BOOT_TIMEOUT
+            for n, d in self._data.items()
+        }
         self._loops = -1
+        # the status json is read from SDO/EDL threads, so instead of clearing it (racy) it is
+        # tagged with the generation it was built from, which is bumped after any status change
+        self._status_gen = 0
+        self._status_json = (-1, "")
+        self._last_counts: Optional[list] = None  # last node state tally written to the od
 
         self._flight_mode_obj: canopen.objectdictionary.Variable = None
         self._nodes_off_obj: canopen.objectdictionary.Variable = None
@@ -152,26 +185,24 @@ class NodeManagerService(Service):
                 lambda v, n=name: self._set_node_status(n, v),
             )
 
-    def _check_co_nodes_state(self, name: str) -> NodeState:
-        """Get a CANopen node's state."""
+    def _check_co_nodes_state(self, name: str, now: float, node_status: dict) -> NodeState:
+        """
+        Get a CANopen node's state, now is the monotonic time for this loop and node_status is
+        the CANopen node status table.
+        """
 
         node = self._data[name]
         next_state = node.status
-        last_hb = self.node.node_status[name][2]
+        last_hb = node_status[name][2]
 
         if next_state == NodeState.DEAD:
-            if monotonic() > last_hb + self._RESET_TIMEOUT_S:
+            if now > last_hb + self._RESET_TIMEOUT_S:
                 # if the node start sending heartbeats again (really only for flatsat)
                 next_state = NodeState.ON
             return next_state
 
-        if node.processor == "stm32":
-            timeout = self._STM32_BOOT_TIMEOUT
-        else:
-            timeout = self._OCTAVO_BOOT_TIMEOUT
-
-        if node.last_enable + timeout > monotonic():
-            if monotonic() > last_hb + self._RESET_TIMEOUT_S:
+        if node.last_enable + self._boot_timeouts[name] > now:
+            if now > last_hb + self._RESET_TIMEOUT_S:
                 next_state = NodeState.BOOT
             else:
                 next_state = NodeState.ON
@@ -180,7 +211,7 @@ class NodeManagerService(Service):
         elif (
             self._flight_mode_obj.value
             and self.node.bus_state == "NETWORK_UP"
-            and monotonic() > (last_hb + self._RESET_TIMEOUT_S)
+            and now > (last_hb + self._RESET_TIMEOUT_S)
         ):
             logger.error(
                 f"CANopen node {name} has had no heartbeats in {self._RESET_TIMEOUT_S} seconds"
@@ -191,42 +222,48 @@ class NodeManagerService(Service):
 
         return next_state
 
-    def _get_nodes_state(self, name: str) -> NodeState:
-        """Determine a node's state."""
+    def _get_nodes_state(self, name: str, now: float, node_status: dict) -> NodeState:
+        """
+        Determine a node's state, now is the monotonic time for this loop and node_status is the
+        CANopen node status table.
+        """
+
+        node = self._data[name]
 
         # update status of data not on the OPD
-        if self._data[name].opd_address == 0:
-            if monotonic() > (self.node.node_status[name][2] + self._HB_TIMEOUT):
+        if node.opd_address == 0:
+            if now > (node_status[name][2] + self._HB_TIMEOUT):
                 next_state = NodeState.OFF
             else:
                 next_state = NodeState.ON
             return next_state
 
+        opd_status = self.opd.status
+
         # opd subsystem is off
-        if self.opd.status == OpdState.DISABLED:
+        if opd_status == OpdState.DISABLED:
             return NodeState.NOT_FOUND
 
-        prev_state = self._data[name].status
-
         # default is last state
-        next_state = prev_state
+        next_state = node.status
 
         # update status of data on the OPD
-        if self.opd.status == OpdState.DEAD:
+        if opd_status == OpdState.DEAD:
             next_state = NodeState.DEAD
         else:
-            status = self.opd[name].status
-            if self._data[name].opd_resets >= self._MAX_CO_RESETS:
+            opd_node = self.opd[name]
+            status = opd_node.status
+            if node.opd_resets >= self._MAX_CO_RESETS:
                 next_state = NodeState.DEAD
             elif status == OpdNodeState.FAULT:
                 next_state = NodeState.ERROR
             elif status == OpdNodeState.NOT_FOUND:
                 next_state = NodeState.NOT_FOUND
             elif status == OpdNodeState.ENABLED:
-                if self._data[name].processor == "stm32" and self.opd[name].in_bootloader_mode:
+                if node.processor == "stm32" and opd_node.in_bootloader_mode:
                     next_state = NodeState.BOOTLOADER
-                elif self._data[name].node_id != 0:  # aka CANopen nodes
-                    next_state = self._check_co_nodes_state(name)
+                elif node.node_id != 0:  # aka CANopen nodes
+                    next_state = self._check_co_nodes_state(name, now, node_status)
                 else:
                     next_state = NodeState.ON
             elif status == OpdNodeState.DISABLED:
@@ -240,60 +277,63 @@ class NodeManagerService(Service):
         self._loops += 1
         self.sleep(1)
 
-        nodes_off = 0
-        nodes_booting = 0
-        nodes_on = 0
-        nodes_with_errors = 0
-        nodes_not_found = 0
-        nodes_dead = 0
-        for name, node in self._data.items():
-            if name == "c3":
-                continue
-
+        # one clock read per loop, the node states only have second-level timeouts
+        now = monotonic()
+
+        # tally of node states, indexed by _STATE_IDX
+        counts = [0] * len(self._STATE_IDX)
+        state_idx = self._STATE_IDX
+        get_nodes_state = self._get_nodes_state
+        node_status = self.node.node_status
+        opd = self.opd
+        opd_state = self._OPD_INACTIVE_NODE_STATES.get(opd.status)
+        for name, node in self._monitored_nodes:
             last_state = node.status
-            state = self._get_nodes_state(name)
-            if self._loops != 0 and state != last_state:
-                logger.info(f"node {name} state change {last_state.name} -> {state.name}")
-            nodes_off += int(state == NodeState.OFF)
-            nodes_booting += int(state == NodeState.BOOT)
-            nodes_on += int(state == NodeState.ON)
-            nodes_with_errors += int(state == NodeState.ERROR)
-            nodes_not_found += int(state == NodeState.NOT_FOUND)
-            nodes_dead += int(state == NodeState.DEAD)
-            node.status = state
-        self._nodes_off_obj.value = nodes_off
-        self._nodes_booting_obj.value = nodes_booting
-        self._nodes_on_obj.value = nodes_on
-        self._nodes_with_errors_obj.value = nodes_with_errors
-        self._nodes_not_found_obj.value = nodes_not_found
-        self._nodes_dead_obj.value = nodes_dead
-
-        if self.opd.status in [OpdState.DEAD, OpdState.DISABLED]:
+            if opd_state is not None and node.opd_address != 0:
+                state = opd_state  # no need to check each node on an inactive opd
+            else:
+                state = get_nodes_state(name, now, node_status)
+            if state != last_state:
+                if self._loops != 0:
+                    logger.info(f"node {name} state change {last_state.name} -> {state.name}")
+                node.status = state
+                self._status_gen += 1  # only after the status write
+            counts[state_idx[state]] += 1
+        if counts != self._last_counts:  # most loops nothing changes
+            self._nodes_off_obj.value = counts[state_idx[NodeState.OFF]]
+            self._nodes_booting_obj.value = counts[state_idx[NodeState.BOOT]]
+            self._nodes_on_obj.value = counts[state_idx[NodeState.ON]]
+            self._nodes_with_errors_obj.value = counts[state_idx[NodeState.ERROR]]
+            self._nodes_not_found_obj.value = counts[state_idx[NodeState.NOT_FOUND]]
+            self._nodes_dead_obj.value = counts[state_idx[NodeState.DEAD]]
+            self._last_counts = counts
+
+        if opd_state is not None:
             self._loops = -1
             return  # nothing to monitor
 
-        if nodes_not_found == len(self._data):
+        if counts[state_idx[NodeState.NOT_FOUND]] == len(self._data):
             self._loops = 0
 
         # reset nodes with errors and probe for nodes not found
-        for name, info in self._data.items():
-            if info.opd_address == 0:
-                continue
-
-            if self._loops % 10 == 0 and self._data[name].status == NodeState.NOT_FOUND:
-                self.opd[name].probe(True)
-
-            if info.opd_always_on and info.status == NodeState.OFF:
-                self.enable(name)
-
-            if info.status == NodeState.DEAD and self.opd[name].is_enabled:
-                self.opd[name].disable()  # make sure this is disabled
-            elif info.status == NodeState.ERROR:
+        probe_phase = self._loops % self._PROBE_LOOPS
+        for name, info, phase in self._opd_nodes:
+            status = info.status  # _enable() below does not change it
+            opd_node = opd[name]
+            if phase == probe_phase and status == NodeState.NOT_FOUND:
+                opd_node.probe(True)
+
+            if info.opd_always_on and status == NodeState.OFF:
+                self._enable(name)
+
+            if status == NodeState.DEAD and opd_node.is_enabled:
+                opd_node.disable()  # make sure this is disabled
+            elif status == NodeState.ERROR:
                 logger.error(f"resetting node {name}, try {info.opd_resets + 1}")
-                self.opd[name].reset(1)
-                self._data[name].last_enable = monotonic()
+                opd_node.reset(1)
+                info.last_enable = monotonic()  # after the reset, not loop start
                 info.opd_resets += 1
-            elif info.status in [NodeState.ON, NodeState.OFF]:
+            elif status in self._NODE_STABLE_STATES:
                 info.opd_resets = 0
 
     def enable(self, name: Union[str, int], bootloader_mode: bool = False):
@@ -309,8 +349,11 @@ class NodeManagerService(Service):
             otherwise.
         """
 
-        if isinstance(name, int):
-            name = self.opd_addr_to_name[name]
+        node_name: str = self.opd_addr_to_name[name] if isinstance(name, int) else name
+        self._enable(node_name, bootloader_mode)
+
+    def _enable(self, name: str, bootloader_mode: bool = False):
+        """Enable a OreSat node by name, see enable()."""
 
         node = self._data[name]
         child_node = self._data[node.child] if node.child else None
@@ -318,14 +361,14 @@ class NodeManagerService(Service):
             logger.warning(f"cannot enable node {name} as it is not on the OPD")
             return  # not on OPD, nothing to do
 
-        if node.status != NodeState.OFF:
-            logger.debug(f"cannot enable node {name} unless it is disabled")
-            return
-
         if node.status == NodeState.DEAD:
             logger.error(f"cannot enable node {name} as it is DEAD")
             return
 
+        if node.status != NodeState.OFF:
+            logger.debug(f"cannot enable node {name} unless it is disabled")
+            return
+
         if node.processor == "stm32":
             self.opd[name].enable(bootloader_mode)
             if child_node:
@@ -346,8 +389,11 @@ class NodeManagerService(Service):
             Name or node id of the card to enable
         """
 
-        if isinstance(name, int):
-            name = self.opd_addr_to_name[name]
+        node_name: str = self.opd_addr_to_name[name] if isinstance(name, int) else name
+        self._disable(node_name)
+
+    def _disable(self, name: str):
+        """Disable a OreSat node by name, see disable()."""
 
         node = self._data[name]
         child_node = self._data[node.child] if node.child else None
@@ -355,7 +401,7 @@ class NodeManagerService(Service):
             logger.warning(f"cannot disable node {name} as it is not on the OPD")
             return  # not on OPD, nothing to do
 
-        if node.status in [NodeState.OFF, NodeState.DEAD]:
+        if node.status in self._NODE_DISABLED_STATES:
             logger.debug(f"cannot disable node {name} as it is already disabled or dead")
             return
 
@@ -374,32 +420,38 @@ class NodeManagerService(Service):
     def _set_node_status(self, name: Union[str, int], state: int):
         """Set the status of a OreSat node."""
 
-        if isinstance(name, int):
-            name = self.opd_addr_to_name[name]
+        node_name: str = self.opd_addr_to_name[name] if isinstance(name, int) else name
 
         if state == NodeState.ON:
-            self.enable(name)
+            self._enable(node_name)
         elif state == NodeState.OFF:
-            self.disable(name)
+            self._disable(node_name)
         elif state == NodeState.BOOTLOADER:
-            self.enable(name, True)
+            self._enable(node_name, True)
 
     def _get_status_json(self) -> str:
         """SDO read callback to get the status of all data as a JSON."""
 
-        data = []
-        for name, info in self._data.items():
-            data.append(
-                {
-                    "name": name,
-                    "nice_name": info.nice_name,
-                    "node_id": info.node_id,
-                    "processor": info.processor,
-                    "opd_addr": info.opd_address,
-                    "status": info.status.name,
-                }
-            )
-        return json.dumps(data)
+        gen = self._status_gen
+        cached_gen, cached_json = self._status_json
+        if cached_gen == gen:
+            return cached_json
+
+        data = [
+            {
+                "name": name,
+                "nice_name": info.nice_name,
+                "node_id": info.node_id,
+                "processor": info.processor,
+                "opd_addr": info.opd_address,
+                "status": info.status.name,
+            }
+            for name, info in self._data.items()
+        ]
+        status_json = json.dumps(data, separators=(",", ":"))
+        # a status change while building bumps the generation past gen, so this is rebuilt
+        self._status_json = (gen, status_json)
+        return status_json
 
     def _get_opd_status(self) -> int:
         return self.opd.status.value
@@ -411,6 +463,7 @@ class NodeManagerService(Service):
                 if node.opd_address != 0 and node.status != NodeState.NOT_FOUND:
                     logger.info(f"node {name} state change {node.status.name} -> NOT_FOUND")
                     node.status = NodeState.NOT_FOUND
+                    self._status_gen += 1
         elif value == 1:
             if self.opd.status == OpdState.DISABLED:
                 for node in self._data.values():
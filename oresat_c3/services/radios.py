@@ -19,6 +19,8 @@ class RadiosService(Service):
     EDL_UPLINK_ADDR = ("localhost", 10025)
     EDL_DOWNLINK_ADDR = ("localhost", 10016)
     BUFFER_LEN = 1024
+    RECV_BATCH_MAX = 8
+    RECV_TIMEOUT_S = 1
     TOT_CLEAR_DELAY_MS = 10
 
     def __init__(self, mock_hw: bool = False):
@@ -60,7 +62,7 @@ class RadiosService(Service):
         logger.info(f"EDL uplink socket: {self.EDL_UPLINK_ADDR}")
         self._edl_uplink_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._edl_uplink_socket.bind(self.EDL_UPLINK_ADDR)
-        self._edl_uplink_socket.settimeout(1)
+        self._edl_uplink_socket.settimeout(self.RECV_TIMEOUT_S)
 
         # EDL downlink: UDP client
         logger.info(f"EDL downlink socket: {self.EDL_DOWNLINK_ADDR}")
@@ -85,9 +87,9 @@ class RadiosService(Service):
             self.node.od["lband"]["synth_relock_count"].value = self._relock_count.bit_length()
             self._si41xx.stop()
             self._si41xx.start()
-        recv = self._recv_edl_request()
-        if recv:
-            self.recv_queue.put(recv)
+        for recv in self._recv_edl_requests():
+            if recv:
+                self.recv_queue.put(recv)
 
     def on_stop(self):
         self.disable()
@@ -153,19 +155,39 @@ class RadiosService(Service):
         except Exception as e:  # pylint: disable=W0718
             logger.error(f"failed to send beacon message: {e}")
 
-        logger.debug(f'Sent beacon downlink packet: {message.hex(sep=" ")}')
+        logger.opt(lazy=True).debug("Sent beacon downlink packet: {}", lambda: message.hex(sep=" "))
 
-    def _recv_edl_request(self) -> bytes:
-        """Recieve an EDL packet."""
+    def _recv_edl_requests(self) -> list[bytes]:
+        """Recieve EDL packets.
+
+        Waits up to the socket timeout for the first packet, then grabs any others that are
+        already waiting without blocking, up to RECV_BATCH_MAX packets total.
+        """
 
         try:
             message, _ = self._edl_uplink_socket.recvfrom(self.BUFFER_LEN)
         except socket.timeout:
-            return b""
+            return []
+
+        messages = [message]
+
+        # MSG_DONTWAIT is not enough as python polls with the socket timeout first
+        self._edl_uplink_socket.setblocking(False)
+        try:
+            while len(messages) < self.RECV_BATCH_MAX:
+                message, _ = self._edl_uplink_socket.recvfrom(self.BUFFER_LEN)
+                messages.append(message)
+        except BlockingIOError:
+            pass
+        finally:
+            self._edl_uplink_socket.settimeout(self.RECV_TIMEOUT_S)
 
-        logger.debug(f'received EDL uplink packet: {message.hex(sep=" ")}')
+        for message in messages:
+            logger.opt(lazy=True).debug(
+                "received EDL uplink packet: {}", lambda m=message: m.hex(sep=" ")
+            )
 
-        return message
+        return messages
 
     def send_edl_response(self, message: bytes):
         """Send an EDL packet."""
@@ -175,4 +197,4 @@ class RadiosService(Service):
         except Exception as e:  # pylint: disable=W0718
             logger.error(f"failed to send mess over EDL downlink: {e}")
 
-        logger.debug(f'sent EDL downlink packet: {message.hex(sep=" ")}')
+        logger.opt(lazy=True).debug("sent EDL downlink packet: {}", lambda: message.hex(sep=" "))
@@ -137,6 +137,12 @@ class TestCacheStore(unittest.TestCase):
         with open(full_path, "rb") as f:
             self.assertEqual(f.read(), b"a" + data[1:] + b"a" * len(data))
 
+        # segments can arrive out of order
+        self.cache.write_data(self.exists, b"c", offset=len(data) * 2 + 1)
+        self.cache.write_data(self.exists, b"b", offset=len(data) * 2)
+        with open(full_path, "rb") as f:
+            self.assertEqual(f.read(), b"a" + data[1:] + b"a" * len(data) + b"bc")
+
     def test_create_file(self):
         """Test create_file()"""
         self.assertEqual(self.cache.create_file(self.exists), FilestoreResult.CREATE_NOT_ALLOWED)
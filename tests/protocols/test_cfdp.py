@@ -0,0 +1,46 @@
+"""Tests the cfdp-py fixes"""
+
+import struct
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from spacepackets.cfdp import ChecksumType
+
+from oresat_c3.protocols.cachestore import CacheStore
+from oresat_c3.protocols.cfdp import VfsCrcHelper
+
+
+def modular_checksum(data: bytes) -> bytes:
+    """Reference modular checksum, summing one 4-byte big endian word at a time"""
+    checksum = 0
+    for i in range(0, len(data), 4):
+        checksum += int.from_bytes(data[i : i + 4].ljust(4, b"\0"), byteorder="big")
+    return struct.pack("!I", checksum % 2**32)
+
+
+class TestVfsCrcHelper(unittest.TestCase):
+    """Tests VfsCrcHelper"""
+
+    def setUp(self):
+        self.cachedir = TemporaryDirectory()
+        self.cache = CacheStore(self.cachedir.name)
+        self.crc_helper = VfsCrcHelper(ChecksumType.MODULAR, self.cache)
+
+    def tearDown(self):
+        self.cachedir.cleanup()
+
+    def _check_modular(self, file: Path, data: bytes):
+        self.cache.create_file(file)
+        self.cache.write_data(file, data)
+        self.assertEqual(self.crc_helper.calc_modular_checksum(file), modular_checksum(data))
+        self.assertEqual(self.crc_helper.calc_for_file(file, len(data)), modular_checksum(data))
+
+    def test_modular_checksum(self):
+        """Test calc_modular_checksum() against a word at a time reference"""
+        self._check_modular(Path("c3_empty_100"), b"")
+        self._check_modular(Path("c3_short_101"), b"\x01\x02\x03")
+        self._check_modular(Path("c3_unaligned_102"), bytes(range(256)) * 4 + b"\xff\xfe")
+        # larger than one read chunk, not a multiple of 4, and overflows 32 bits
+        data = bytes((i * 7 + 3) % 256 for i in range(3 * VfsCrcHelper._MODULAR_READ_LEN + 5))
+        self._check_modular(Path("c3_large_103"), b"\xff" * 4 * 1000 + data)
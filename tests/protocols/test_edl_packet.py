@@ -9,6 +9,7 @@ from oresat_c3.protocols.edl_packet import (
     SRC_DEST_UNICLOGS,
     EdlPacket,
     EdlPacketError,
+    crc16_bytes,
 )
 
 
@@ -44,6 +45,16 @@ class TestEdlPacket(unittest.TestCase):
         with self.assertRaises(EdlPacketError):
             EdlPacket.unpack(short_packet, self.hmac_key)
 
+    def test_peek_seq_num(self):
+        """Test getting the sequence number from a packed EDL packet."""
+
+        payload = EdlCommandRequest(EdlCommandCode.TX_CTRL, (True,))
+        edl_message_req = EdlPacket(payload, 0x12345678, SRC_DEST_ORESAT).pack(self.hmac_key)
+        self.assertEqual(EdlPacket.peek_seq_num(edl_message_req), 0x12345678)
+
+        with self.assertRaises(EdlPacketError):
+            EdlPacket.peek_seq_num(b"\x00" * (EdlPacket.TC_MIN_LEN - 1))
+
     def test_unpack_invalid_fecf(self):
         """Test unpacking an EDL packet with an invalid FECF."""
 
@@ -60,6 +71,20 @@ class TestEdlPacket(unittest.TestCase):
         with self.assertRaises(EdlPacketError):
             EdlPacket.unpack(edl_message_req, self.hmac_key)
 
+    def test_unpack_invalid_spacecraft_id(self):
+        """Test unpacking an EDL packet for another spacecraft (with a valid FECF)."""
+
+        payload = EdlCommandRequest(EdlCommandCode.TX_CTRL, (True,))
+        edl_packet_req = EdlPacket(payload, self.seq_num, SRC_DEST_ORESAT)
+        edl_message_req = edl_packet_req.pack(self.hmac_key)
+
+        edl_message_req = bytearray(edl_message_req[:-2])
+        edl_message_req[1] ^= 0xFF  # corrupt the spacecraft id
+        edl_message_req = bytes(edl_message_req) + crc16_bytes(edl_message_req)
+
+        with self.assertRaises(EdlPacketError):
+            EdlPacket.unpack(edl_message_req, self.hmac_key)
+
     def test_unpack_invalid_hmac(self):
         """Test unpacking an EDL packet with an invalid HMAC."""
 